@@ -5,6 +5,7 @@ from typing import List, Union, Optional, Generator, cast
 from zipfile import ZipFile, Path
 from abc import ABC, abstractmethod
 import hashlib
+import mmap
 import os
 
 
@@ -106,6 +107,19 @@ class FileReal(FileBase):
                 f"as {self.full_path}"
             )
 
+    def contains(self, needle: bytes) -> bool:
+        # search the mapped file pages directly rather than reading and
+        # copying the whole file into memory first
+        with open(self.full_path, 'rb') as file:
+            if os.fstat(file.fileno()).st_size == 0:
+                return needle == b''
+            with mmap.mmap(
+                        file.fileno(),
+                        0,
+                        access=mmap.ACCESS_READ
+                    ) as mapped:
+                return mapped.find(needle) != -1
+
     def rename(self, new_name: str) -> None:
         parent_dir = cast(DirectoryBase, self.parent).full_path
         new_path = os.path.join(parent_dir, new_name)
@@ -124,12 +138,14 @@ class DirectoryReal(DirectoryBase):
     def list(self) -> List[Union[FileBase, 'DirectoryBase']]:
         children: List[Union[FileBase, 'DirectoryBase']] = []
 
-        for item in os.listdir(self.full_path):
-            if os.path.isfile(os.path.join(self.full_path, item)):
-                children.append(FileReal(self, item))
-            elif os.path.isdir(os.path.join(self.full_path, item)):
-                item_path = os.path.join(self.full_path, item)
-                children.append(DirectoryReal(self, item_path))
+        # scandir hands back each entry's type with the listing itself,
+        # instead of needing a stat per entry to tell files from folders
+        with os.scandir(self.full_path) as entries:
+            for entry in entries:
+                if entry.is_file():
+                    children.append(FileReal(self, entry.name))
+                elif entry.is_dir():
+                    children.append(DirectoryReal(self, entry.name))
 
         return children
 
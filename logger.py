@@ -6,4 +6,4 @@ from filesystem import FileReal, DirectoryBase
 
 class Log(FileReal):
     def identifyError(self, error: str) -> bool:
-        return False
+        return self.contains(error.encode())
@@ -2,6 +2,7 @@
 from zipfile import ZipFile
 from typing import cast
 import argparse
+import sys
 import os
 
 from filesystem import DirectoryReal, DirectoryZip, FileZip
@@ -9,18 +10,24 @@ from version import VersionRange, Version, VersionRangePart
 from mod_info import ModPack, Mod
 
 
+def positive_int(value: str) -> int:
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {value}")
+    return number
+
+
 def main(args: argparse.Namespace):
+    # relative paths already resolve against the working directory, so a
+    # single stat answers whether the instance exists
     if not os.path.isdir(args.instance):
-        if not os.path.isdir(os.path.join(os.getcwd(), args.instance)):
-            print(f"invalid instance directory '{args.instance}'")
-            exit(255)
-        else:
-            args.instance = os.path.join(os.getcwd(), args.instance)
+        print(f"invalid instance directory '{args.instance}'")
+        exit(255)
 
     pack = ModPack(DirectoryReal(None, args.instance))
 
     print('LOADING PACK')
-    if not pack.load():
+    if not pack.load(args.jobs):
         return
     if args.versions:
         for modid, version in [
@@ -31,8 +38,8 @@ def main(args: argparse.Namespace):
                 mod._version = Version.fromString(version)
                 mod.filename = '[no file]'
                 mod.name = modid
-                mod.modid = modid
-                pack.mods[modid] = mod
+                mod.modid = sys.intern(modid)
+                pack.mods[mod.modid] = mod
             else:
                 pack.mods[modid]._version = Version.fromString(version)
 
@@ -80,6 +87,13 @@ if __name__ == '__main__':
         help='lie to the provided mods so they think requirements are met. '
              'eg: `<modid>[,<modid>[,...]]`'
     )
+    parser.add_argument(
+        '--jobs',
+        dest='jobs',
+        type=positive_int,
+        help='number of processes used to read mod jars '
+             '(default: the cpu count)'
+    )
     parser.add_argument(
         'instance',
         type=str,
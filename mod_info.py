@@ -2,29 +2,50 @@
 from pygtail import Pygtail  # type: ignore
 from attrs import define
 from tqdm import tqdm
-import toml
 
-from typing import cast, List, Dict, Union, Any, Optional, Set
-from zipfile import ZipFile
+from typing import cast, List, Dict, Union, Any, Optional, Set, Tuple
+from typing import FrozenSet, Iterable
+from concurrent.futures import ProcessPoolExecutor
+from collections import deque
+from functools import partial
+from itertools import chain
+from zipfile import ZipFile, ZipInfo
 import io
 import os
+import pickle
 import re
+import sys
 
-from filesystem import FileBase, FileReal, DirectoryZip, DirectoryReal, FileZip
+if sys.version_info >= (3, 11):
+    import tomllib
+else:
+    import tomli as tomllib
+
+from filesystem import FileBase, FileReal, DirectoryZip, DirectoryReal
+from logger import Log
 from version import VersionRange, Version, BadVersionString
 
 
+# provided by the loader itself rather than by a jar in the mods folder
+BUILTIN_MODIDS = frozenset({'minecraft', 'forge'})
+
+# an external reference to a manifest value, eg: `${file.jarVersion}`
+EXTERNAL_FIELD_RE = re.compile(r'\${([^}]+)}')
+
+
 class DependencyFailure(Exception):
     ...
 
 
 class ModDependency:
+    __slots__ = ('modid', 'required', 'version_reqs')
+
     modid: str
     required: bool
     version_reqs: List[VersionRange]
 
     def __init__(self, modid: str, required: bool, version_range: str):
-        self.modid = modid
+        self.modid = sys.intern(modid)
         self.required = required
         self.version_reqs = VersionRange.fromString(version_range)
 
@@ -51,8 +72,114 @@ MANIFEST_MAPPING: Dict[str, Union[str, List[str]]] = {
     'minecraft_version_range': '*',
 }
 
+# every jar entry a mod is loaded from
+MOD_METADATA_FILES = ('META-INF/mods.toml', 'META-INF/MANIFEST.MF')
+
+# scan results of previous runs, keyed by (jar path, mtime, size)
+SCAN_CACHE_PATH = os.path.join(
+    os.environ.get('XDG_CACHE_HOME') or os.path.expanduser('~/.cache'),
+    'mc-packer',
+    'scan-cache.pickle'
+)
+# bump whenever the shape of a scan result changes
+SCAN_CACHE_VERSION = 1
+
+ScanResult = List[Tuple[str, Dict[str, Any], str]]
+ScanKey = Tuple[str, int, int]
+
+
+def scan_jar(jar: DirectoryZip) -> List[Tuple[str, Dict[str, bytes]]]:
+    # (path, metadata) for `jar` and every nested jar that holds a mod,
+    # nested jars first
+    found: List[Tuple[str, Dict[str, bytes]]] = []
+    zip_file = cast(ZipFile, jar._zip)
+
+    # one pass over the central directory picks out everything needed.
+    # members are then read through their ZipInfo, skipping the by-name
+    # lookup `ZipFile.read` would otherwise repeat
+    metadata_infos: Dict[str, ZipInfo] = {}
+    nested_infos: List[ZipInfo] = []
+    for info in zip_file.infolist():
+        if info.filename in MOD_METADATA_FILES:
+            metadata_infos[info.filename] = info
+        elif info.filename.endswith('.jar'):
+            nested_infos.append(info)
+
+    for info in nested_infos:
+        with io.BytesIO(zip_file.read(info)) as nested_jar_bytes:
+            with ZipFile(nested_jar_bytes, 'r') as nested_jar:
+                _dir = DirectoryZip(jar, info.filename, nested_jar)
+                found.extend(scan_jar(_dir))  # yay recursion
+
+    toml_info = metadata_infos.get("META-INF/mods.toml")
+    if toml_info is not None:
+        mods_toml = zip_file.read(toml_info)
+        metadata = {"META-INF/mods.toml": mods_toml}
+        # the manifest is only consulted to resolve `${...}` references in
+        # mods.toml, so most jars never need it inflated at all
+        manifest_info = metadata_infos.get("META-INF/MANIFEST.MF")
+        if manifest_info is not None and b'${' in mods_toml:
+            metadata["META-INF/MANIFEST.MF"] = zip_file.read(manifest_info)
+        found.append((jar.full_path, metadata))
+    return found
+
+
+def scan_mod_file(mod_dir_path: str, name: str) -> ScanResult:
+    # (path, mods.toml data, manifest) for every mod in the file, with paths
+    # relative to the mods folder. this runs in a worker process, so it
+    # returns plain data rather than Mods
+    with ZipFile(os.path.join(mod_dir_path, name), 'r') as jar:
+        found = scan_jar(DirectoryZip(None, name, jar))
+
+    return [
+        (
+            path,
+            # the toml package accepted a utf-8 BOM in front of mods.toml and
+            # jars in the wild rely on it. tomllib doesn't, so strip it here
+            tomllib.loads(
+                metadata["META-INF/mods.toml"].decode('utf-8-sig')
+            ),
+            metadata.get("META-INF/MANIFEST.MF", b"").decode()
+        ) for path, metadata in found
+    ]
+
+
+def load_scan_cache() -> Dict[ScanKey, ScanResult]:
+    try:
+        with open(SCAN_CACHE_PATH, 'rb') as file:
+            version, cache = pickle.load(file)
+    except Exception:
+        # missing, unreadable or corrupt: start over
+        return {}
+    if version != SCAN_CACHE_VERSION:
+        return {}
+    return cache
+
+
+def save_scan_cache(cache: Dict[ScanKey, ScanResult]) -> None:
+    # written aside and swapped in, so a concurrent run never reads half
+    # a file
+    temp_path = f"{SCAN_CACHE_PATH}.{os.getpid()}"
+    try:
+        os.makedirs(os.path.dirname(SCAN_CACHE_PATH), exist_ok=True)
+        with open(temp_path, 'wb') as file:
+            pickle.dump((SCAN_CACHE_VERSION, cache), file)
+        os.replace(temp_path, SCAN_CACHE_PATH)
+    except OSError:
+        # the cache is only an optimisation, but a half written temp file
+        # shouldn't be left lying around
+        try:
+            os.unlink(temp_path)
+        except OSError:
+            pass
+
 
 class Mod:
+    __slots__ = (
+        'filename', 'name', 'modid', '_version', 'dependencies',
+        'dependents', 'errors', 'pack', 'manifest', 'toml_data', 'parent'
+    )
+
     filename:       str
     name:           str
     modid:          str
@@ -73,25 +200,49 @@ class Mod:
         self.manifest = {}
         self.pack = pack
 
+    def _cascade(self, field: str) -> List['Mod']:
+        # this mod plus every installed mod reachable from it through
+        # `field` ('dependencies' or 'dependents'), each exactly once, so
+        # shared libraries and dependency cycles are only visited once
+        visited = {self.modid}
+        cascade = [self]
+        queue = deque(cascade)
+        while queue:
+            mod = queue.popleft()
+            if not mod.filename or mod.filename == '[no file]':
+                continue
+            for dep in getattr(mod, field):
+                dep_mod = self.pack.mods.get(dep.modid)
+                if dep_mod is None or dep.modid in visited:
+                    continue
+                visited.add(dep.modid)
+                cascade.append(dep_mod)
+                queue.append(dep_mod)
+        return cascade
+
+    def _in_mods_folder(self) -> bool:
+        # mods loaded from a jar nested inside another one have no file of
+        # their own to rename. they go with the jar that contains them
+        mods_path = os.path.join(self.pack.directory.full_path, 'mods')
+        return os.path.dirname(self.filename) == mods_path
+
     def enable(self) -> None:
-        if self.filename.endswith('.jar.disabled'):
-            new_name = self.filename.removesuffix('.disabled')
-            FileReal(self.pack.directory, self.filename).rename(new_name)
-            self.filename = new_name
-        if self.filename and self.filename != '[no file]':
-            for dep in self.dependencies:
-                if dep.modid in self.pack.mods:
-                    self.pack.mods[dep.modid].enable()
+        for mod in self._cascade('dependencies'):
+            if not mod._in_mods_folder():
+                continue
+            if mod.filename.endswith('.jar.disabled'):
+                new_name = mod.filename.removesuffix('.disabled')
+                FileReal(mod.pack.directory, mod.filename).rename(new_name)
+                mod.filename = new_name
 
     def disable(self) -> None:
-        if self.filename.endswith('.jar'):
-            new_name = self.filename + ".disabled"
-            FileReal(self.pack.directory, self.filename).rename(new_name)
-            self.filename = new_name
-        if self.filename and self.filename != '[no file]':
-            for dep in self.dependents:
-                if dep.modid in self.pack.mods:
-                    self.pack.mods[dep.modid].enable()
+        for mod in self._cascade('dependents'):
+            if not mod._in_mods_folder():
+                continue
+            if mod.filename.endswith('.jar'):
+                new_name = mod.filename + ".disabled"
+                FileReal(mod.pack.directory, mod.filename).rename(new_name)
+                mod.filename = new_name
 
     @classmethod
     def load(cls,
@@ -99,23 +250,30 @@ class Mod:
                 filename: str,
                 toml_data: Dict[str, Any],
                 manifest: str
-            ) -> 'Mod':
+            ) -> Optional['Mod']:
+        # jars without a mods section don't describe a mod
+        if "mods" not in toml_data or len(toml_data['mods']) == 0:
+            return None
+
         instance = cls(pack)
         instance.filename = filename
 
         if manifest != "":
-            manifest = manifest.replace('\r\n', '\n')
-            while '\n\n' in manifest:
-                manifest = manifest.replace('\n\n', '\n')
-
-            for line in manifest.split('\n'):
-                parts = line.split(':')
-                if len(parts) == 2:
-                    instance.manifest[parts[0].strip()] = parts[1].strip()
+            # only the first colon separates key from value. values such as
+            # urls and class paths contain more of them. lines without one,
+            # blank lines included, are skipped. keys are the same handful
+            # of names in every jar, so they are interned
+            instance.manifest.update(
+                (sys.intern(key.strip()), value.strip())
+                for key, sep, value in (
+                    line.partition(':') for line in manifest.split('\n')
+                )
+                if sep
+            )
 
-        def processExternalField(field_raw: str) -> str:
+        def resolveExternalField(field_raw: str) -> str:
             # checks if string is an external reference `${<var_name>}`
-            extern = re.match(r'\${([^}]+)}', field_raw)
+            extern = EXTERNAL_FIELD_RE.match(field_raw)
             if not extern:
                 return field_raw
 
@@ -143,90 +301,127 @@ class Mod:
             else:
                 raise ValueError(f"failed to process field value {field_raw}")
 
-        if "mods" in toml_data and len(toml_data['mods']) > 0:
-            mod = toml_data['mods'][0]
+        # the same references (usually `${file.jarVersion}`) show up in the
+        # version and in many dependency ranges of a single mods.toml
+        resolved_fields: Dict[str, str] = {}
 
-            instance.modid = processExternalField(mod['modId'])
-            instance._version = Version.fromString(
-                processExternalField(mod['version'])
-            )
-            instance.name = processExternalField(mod["displayName"])
-            instance.toml_data = toml_data
-
-            toml_deps_len = len(toml_data["dependencies"])
-            if "dependencies" in toml_data and toml_deps_len > 0:
-                deps = toml_data["dependencies"]
-                if instance.modid in deps and len(deps[instance.modid]) > 0:
-                    for dependency in deps[instance.modid]:
-                        try:
-                            version_range = processExternalField(
-                                dependency['versionRange']
-                            )
-                            instance.dependencies.append(
-                                ModDependency(
-                                    dependency["modId"],
-                                    dependency['mandatory'],
-                                    version_range
-                                )
-                            )
-                        except BadVersionString as e:
-                            instance.errors.append(
-                                f"'{instance.name}' dependency "
-                                f"'{dependency['modId']}' has invalid "
-                                f"version range '{dependency['versionRange']}'"
+        def processExternalField(field_raw: str) -> str:
+            if '${' not in field_raw:
+                return field_raw
+            if field_raw not in resolved_fields:
+                resolved_fields[field_raw] = resolveExternalField(field_raw)
+            return resolved_fields[field_raw]
+
+        mod = toml_data['mods'][0]
+
+        instance.modid = sys.intern(processExternalField(mod['modId']))
+        instance._version = Version.fromString(
+            processExternalField(mod['version'])
+        )
+        instance.name = processExternalField(mod["displayName"])
+        instance.toml_data = toml_data
+
+        toml_deps_len = len(toml_data["dependencies"])
+        if "dependencies" in toml_data and toml_deps_len > 0:
+            deps = toml_data["dependencies"]
+            if instance.modid in deps and len(deps[instance.modid]) > 0:
+                for dependency in deps[instance.modid]:
+                    try:
+                        version_range = processExternalField(
+                            dependency['versionRange']
+                        )
+                        instance.dependencies.append(
+                            ModDependency(
+                                dependency["modId"],
+                                dependency['mandatory'],
+                                version_range
                             )
+                        )
+                    except BadVersionString as e:
+                        instance.errors.append(
+                            f"'{instance.name}' dependency "
+                            f"'{dependency['modId']}' has invalid "
+                            f"version range '{dependency['versionRange']}'"
+                        )
 
         return instance
 
 
 class DependencyGraph:
-    _ALL_GRAPHS:    Dict[str, 'DependencyGraph'] = {}
-    _ALL_NODES:     Dict[str, 'Node'] = {}
-
     class Node:
+        __slots__ = ('mod_set', 'graph', '_deps_cache', '_dependents_cache')
+
         mod_set:    Set[Mod]
         graph:      'DependencyGraph'
 
+        # flattened dependency lists of every mod in `mod_set`, rebuilt
+        # only after the node's membership changes
+        _deps_cache:        Optional[List[ModDependency]]
+        _dependents_cache:  Optional[List[ModDependency]]
+
         def __init__(self, mod: Mod, graph: 'DependencyGraph'):
             self.mod_set = {mod}
             self.graph = graph
-            if mod.modid in DependencyGraph._ALL_NODES:
+            self._deps_cache = None
+            self._dependents_cache = None
+            if mod.modid in graph.resolver.nodes:
                 raise ValueError(f"modid '{mod.modid}' already has a node")
 
         def merge(self, other: 'DependencyGraph.Node') -> None:
-            self.mod_set.union(other.mod_set)
+            if other is self:
+                return
+            self.mod_set |= other.mod_set
+            resolver = self.graph.resolver
             for mod in other.mod_set:
-                DependencyGraph._ALL_GRAPHS[mod.modid] = self.graph
-                DependencyGraph._ALL_NODES[mod.modid] = self
-            other.mod_set = set()
+                resolver.graphs[mod.modid] = self.graph
+                resolver.nodes[mod.modid] = self
+                other.graph._modid_index.pop(mod.modid, None)
+                self.graph._modid_index[mod.modid] = mod
+            other.mod_set.clear()
+            self._deps_cache = None
+            self._dependents_cache = None
+            other._deps_cache = None
+            other._dependents_cache = None
 
         @property
         def dependencies(self) -> List[ModDependency]:
-            deps = []
-            for mod in self.mod_set:
-                deps.extend(mod.dependencies)
-            return deps
+            if self._deps_cache is None:
+                deps: List[ModDependency] = []
+                for mod in self.mod_set:
+                    deps += mod.dependencies
+                self._deps_cache = deps
+            return self._deps_cache
 
         @property
         def dependents(self) -> List[ModDependency]:
-            deps = []
-            for mod in self.mod_set:
-                deps.extend(mod.dependents)
-            return deps
-
-    nodes: List[Node]
-
-    def __init__(self, mod: Mod):
+            if self._dependents_cache is None:
+                deps: List[ModDependency] = []
+                for mod in self.mod_set:
+                    deps += mod.dependents
+                self._dependents_cache = deps
+            return self._dependents_cache
+
+    nodes:          List[Node]
+    resolver:       'DependencyResolver'
+    _modid_index:   Dict[str, Mod]
+
+    def __init__(self, mod: Mod, resolver: 'DependencyResolver'):
+        self.resolver = resolver
         self.nodes = [DependencyGraph.Node(mod, self)]
+        self._modid_index = {mod.modid: mod}
+        resolver.nodes[mod.modid] = self.nodes[0]
+        resolver.graphs[mod.modid] = self
 
     def merge(self, other: 'DependencyGraph') -> None:
         for node in other.nodes:
             for mod in node.mod_set:
-                DependencyGraph._ALL_GRAPHS[mod.modid] = self
-                DependencyGraph._ALL_NODES[mod.modid] = node
+                self.resolver.graphs[mod.modid] = self
+                self.resolver.nodes[mod.modid] = node
             node.graph = self
             self.nodes.append(node)
+        self._modid_index.update(other._modid_index)
         other.nodes = []
+        other._modid_index = {}
 
     def disable_all(self) -> None:
         for node in self.nodes:
@@ -239,88 +434,182 @@ class DependencyGraph:
                 mod.enable()
 
 
+class DependencyResolver:
+    # which graph and node every mod currently belongs to. owned by one
+    # resolver rather than the DependencyGraph class, so separate runs in
+    # the same process don't see each other's graphs
+    graphs:     Dict[str, DependencyGraph]
+    nodes:      Dict[str, DependencyGraph.Node]
+
+    def __init__(self):
+        self.graphs = {}
+        self.nodes = {}
+
+    def gen_graphs(self, mods: Iterable[Mod]) -> List[DependencyGraph]:
+        self.graphs = {}
+        self.nodes = {}
+
+        mods = [mod for mod in mods if mod.modid not in BUILTIN_MODIDS]
+        for mod in mods:
+            DependencyGraph(mod, self)
+
+        # TODO: Merge circular node paths into a single node each
+
+        # nodes whose dependencies and dependents have already been merged
+        # into their graph. a node is only ever expanded once
+        visited: Set[DependencyGraph.Node] = set()
+        for mod in mods:
+            self._process_graph(self.graphs[mod.modid], visited)
+
+        graph_list: List[DependencyGraph] = []
+        seen_ids: Set[int] = set()
+        for node in self.nodes.values():
+            if id(node.graph) in seen_ids:
+                continue
+            seen_ids.add(id(node.graph))
+            graph_list.append(node.graph)
+        return graph_list
+
+    def _process_graph(
+                self,
+                graph: DependencyGraph,
+                visited: Set[DependencyGraph.Node]
+            ) -> None:
+        worklist = deque(graph.nodes)
+        while worklist:
+            node = worklist.popleft()
+            if node in visited:
+                continue
+            visited.add(node)
+            for dep in chain(node.dependents, node.dependencies):
+                if dep.modid in BUILTIN_MODIDS:
+                    continue
+                # not installed
+                dep_graph = self.graphs.get(dep.modid)
+                if dep_graph is None or dep_graph is graph:
+                    continue
+                worklist.extend(dep_graph.nodes)
+                graph.merge(dep_graph)
+
+
 class ModPack:
     directory:  DirectoryReal
     mods:       Dict[str, Mod]
     errors:     List[str]
+    # (modids the graphs were built from, their resolver, graphs by size)
+    _graphs_cache: Optional[
+        Tuple[FrozenSet[str], DependencyResolver, List[DependencyGraph]]
+    ]
 
     def __init__(self, directory: DirectoryReal):
         self.directory = directory
         self.mods = {}
         self.errors = []
+        self._graphs_cache = None
 
-    def process_jar(self, jar: DirectoryZip) -> bool:
-        found = False
-
-        for item in [x for x in jar.list() if x.name.endswith('.jar')]:
-            with io.BytesIO(
-                        cast(ZipFile, jar._zip).read(item.name)
-                    ) as nested_jar_bytes:
-                with ZipFile(nested_jar_bytes, 'r') as nested_jar:
-                    _dir = DirectoryZip(jar, item.name, nested_jar)
-                    found = found or self.process_jar(_dir)  # yay recursion
-
-        if jar.has("META-INF/mods.toml"):
-            found = True
-            toml_data = toml.loads(
-                FileZip("META-INF/mods.toml", jar).read().decode()
-            )
-            manifest = ""
-            if jar.has("META-INF/MANIFEST.MF"):
-                manifest = FileZip(
-                    "META-INF/MANIFEST.MF",
-                    jar
-                ).read().decode()
-
-            mod = Mod.load(self, jar.full_path, toml_data, manifest)
-            if hasattr(mod, 'modid'):
-                self.mods[mod.modid] = mod
-        return found
-
-    def load(self) -> bool:
+    def process_jar(
+                self,
+                path: str,
+                toml_data: Dict[str, Any],
+                manifest: str
+            ) -> None:
+        mod = Mod.load(self, path, toml_data, manifest)
+        if mod is not None:
+            self.mods[mod.modid] = mod
+
+    def load(self, jobs: Optional[int] = None) -> bool:
+        self._graphs_cache = None
         mod_dir = DirectoryReal(self.directory, 'mods')
         # for file in self.directory.list():
-        for file in tqdm(mod_dir.list()):
-            if not issubclass(type(file), FileBase):
+        names: List[str] = []
+        for file in mod_dir.list():
+            if not isinstance(file, FileBase):
                 continue
-            file = cast(FileBase, file)
             if file.name.endswith('.disabled'):
                 continue
-
-            with ZipFile(
-                        os.path.join(mod_dir.full_path, file.name),
-                        'r'
-                    ) as jar:
-                result = self.process_jar(
-                    DirectoryZip(mod_dir, file.name, jar)
+            names.append(file.name)
+
+        # jars that haven't changed since a previous run are served from the
+        # on-disk cache. only the rest get scanned
+        mod_dir_path = os.path.abspath(mod_dir.full_path)
+        cache = load_scan_cache()
+        keys: Dict[str, ScanKey] = {}
+        for name in names:
+            path = os.path.join(mod_dir_path, name)
+            stat = os.stat(path)
+            keys[name] = (path, stat.st_mtime_ns, stat.st_size)
+        stale = [name for name in names if keys[name] not in cache]
+
+        # inflating the jars and parsing their toml is cpu-bound and
+        # independent per file, so it is spread over worker processes
+        if stale:
+            with ProcessPoolExecutor(max_workers=jobs) as executor:
+                scanned = executor.map(
+                    partial(scan_mod_file, mod_dir_path),
+                    stale,
+                    chunksize=4
                 )
-                if not result:
-                    self.errors.append(
-                        f"Failed to locate mod in jar '{file.name}'"
-                    )
-                    # return False
+                for name, found in tqdm(zip(stale, scanned), total=len(stale)):
+                    cache[keys[name]] = found
+
+        # mods are built here, in directory order
+        for name in names:
+            found = cache[keys[name]]
+            if not found:
+                self.errors.append(f"Failed to locate mod in jar '{name}'")
+                # return False
+            for path, toml_data, manifest in found:
+                self.process_jar(
+                    os.path.join(mod_dir.full_path, path),
+                    toml_data,
+                    manifest
+                )
+
+        # an entry is kept for as long as its jar is on disk, disabled or
+        # not, whichever instance it belongs to. older entries for the jars
+        # scanned here are dropped
+        current = set(keys.values())
+        current_paths = {path for path, _, _ in current}
+
+        def on_disk(path: str) -> bool:
+            return os.path.exists(path) or os.path.exists(f"{path}.disabled")
+
+        kept = {
+            key: found for key, found in cache.items()
+            if key in current
+            or (key[0] not in current_paths and on_disk(key[0]))
+        }
+        # the file is shared by every instance, so it is only rewritten when
+        # this run actually changed something
+        if stale or len(kept) != len(cache):
+            save_scan_cache(kept)
         return True
 
     def validateVersions(self, verbose: bool) -> bool:
-        for mod in self.mods.values():
+        # the reverse dependencies added below change how mods connect
+        self._graphs_cache = None
+        mods = self.mods
+        for mod in mods.values():
+            modid = mod.modid
             for dep in mod.dependencies:
-                if dep.modid in self.mods:
-                    dependency = self.mods[dep.modid]
-                    if not dep.validateMod(dependency):
-                        dependency.errors.append(
-                            f"'{mod.modid}' requires '{dep.version_reqs}'"
-                        )
-
-                    rdep_mod = ModDependency(mod.modid, False, '*')
-                    rdep_mod.version_reqs = dep.version_reqs
-                    dependency.dependents.append(rdep_mod)
-
-                else:
-                    if dep.required and dep.modid not in []:
+                dependency = mods.get(dep.modid)
+                if dependency is None:
+                    if dep.required:
                         mod.errors.append(
                             f"Could not find mod '{dep.modid}'! "
                             f"requirements: {dep.version_reqs}"
                         )
+                    continue
+
+                version_reqs = dep.version_reqs
+                if not dep.validateMod(dependency):
+                    dependency.errors.append(
+                        f"'{modid}' requires '{version_reqs}'"
+                    )
+
+                rdep_mod = ModDependency(modid, False, '*')
+                rdep_mod.version_reqs = version_reqs
+                dependency.dependents.append(rdep_mod)
 
         err_num = 0
         for mod in self.mods.values():
@@ -352,7 +641,7 @@ class ModPack:
         print(f' -> Dependencies')
         for dep in mod.dependencies:
             vers_reqs_met = any(
-                [range.contains(mod._version) for range in dep.version_reqs]
+                r.contains(mod._version) for r in dep.version_reqs
             )
             if not error or (error and not vers_reqs_met):
                 dep_mod = self.mods.get(dep.modid, None)
@@ -368,7 +657,7 @@ class ModPack:
         print(f' -> Dependents')
         for dep in mod.dependents:
             vers_reqs_met = any(
-                [range.contains(mod._version) for range in dep.version_reqs]
+                r.contains(mod._version) for r in dep.version_reqs
             )
             if not error or (error and not vers_reqs_met):
                 dep_mod = self.mods.get(dep.modid, None)
@@ -384,60 +673,27 @@ class ModPack:
     def run(self) -> bool:
         return False
 
-    def identifyBrokenMods(self, error: str) -> bool:
-        graphs: List[DependencyGraph] = []
-
-        for mod in self.mods.values():
-            if mod.modid in ['minecraft', 'forge']:
-                continue
-            graph = DependencyGraph(mod)
-            graphs.append(graph)
-            DependencyGraph._ALL_NODES[mod.modid] = graph.nodes[0]
-            DependencyGraph._ALL_GRAPHS[mod.modid] = graph
-
-        # TODO: Merge circular node paths into a single node each
-
-        def process_graph(graph: DependencyGraph):
-            for node in graph.nodes:
-                for dep in node.dependents:
-                    invalid_modid = dep.modid in ['minecraft', 'forge']
-                    not_installed = dep.modid not in self.mods
-                    if invalid_modid or (not dep.required and not_installed):
-                        continue
-                    mod_graph = DependencyGraph._ALL_GRAPHS[mod.modid]
-                    dep_graph = DependencyGraph._ALL_GRAPHS[dep.modid]
-                    if mod_graph is not dep_graph:
-                        mod_graph.merge(dep_graph)
-                        process_graph(dep_graph)
-                for dep in node.dependencies:
-                    invalid_modid = dep.modid in ['minecraft', 'forge']
-                    not_installed = dep.modid not in self.mods
-                    if invalid_modid or (not dep.required and not_installed):
-                        continue
-                    mod_graph = DependencyGraph._ALL_GRAPHS[mod.modid]
-                    dep_graph = DependencyGraph._ALL_GRAPHS[dep.modid]
-                    if mod_graph is not dep_graph:
-                        mod_graph.merge(dep_graph)
-                        process_graph(dep_graph)
-
-        for mod in self.mods.values():
-            if mod.modid in ['minecraft', 'forge']:
-                continue
-            process_graph(DependencyGraph._ALL_GRAPHS[mod.modid])
+    def _graphs(self) -> Tuple[DependencyResolver, List[DependencyGraph]]:
+        # besides the set of loaded mods, the graphs depend on every mod's
+        # dependencies and dependents. those only change in load and
+        # validateVersions, which both drop the cache
+        modids = frozenset(self.mods.keys())
+        if self._graphs_cache is not None and self._graphs_cache[0] == modids:
+            return self._graphs_cache[1], self._graphs_cache[2]
 
-        graph_list: List[DependencyGraph] = []
-        for node in DependencyGraph._ALL_NODES.values():
-            if node.graph not in graph_list:
-                graph_list.append(node.graph)
+        resolver = DependencyResolver()
+        graph_list = resolver.gen_graphs(self.mods.values())
         # sort by number of mods in graph
-        graph_list = sorted(
-            graph_list,
-            key=(lambda x: sum([len(y.mod_set) for y in x.nodes]))
-        )
+        graph_list.sort(key=(lambda x: len(x._modid_index)))
+        self._graphs_cache = (modids, resolver, graph_list)
+        return resolver, graph_list
+
+    def identifyBrokenMods(self, error: str) -> bool:
+        resolver, graph_list = self._graphs()
 
         for i, graph in enumerate(graph_list):
             print('==================================')
-            mod_count = sum([len(y.mod_set) for y in graph.nodes])
+            mod_count = len(graph._modid_index)
             print(f'Graph {i} ({mod_count} mods):')
             for node in graph.nodes:
                 for mod in node.mod_set:
@@ -449,8 +705,8 @@ class ModPack:
 
         missing_count = 0
         for modid in self.mods.keys():
-            invalid_modid = modid in ['minecraft', 'forge']
-            mod_installed = modid in DependencyGraph._ALL_NODES.keys()
+            invalid_modid = modid in BUILTIN_MODIDS
+            mod_installed = modid in resolver.nodes
             if not mod_installed and not invalid_modid:
                 missing_count += 1
                 mod_name = self.mods[modid].name
@@ -461,12 +717,12 @@ class ModPack:
 
         error_files = ['latest.log', 'debug.log', 'latest_stdout.log']
         search_filename = ''
-        for candidate in error_files:
+        # the last log in `error_files` that mentions the error wins
+        for candidate in reversed(error_files):
             log_exists = logs.has(candidate)
-            log = FileReal(logs, candidate)
-            log_has_error = error in log.read().decode(errors="ignore")
-            if log_exists and log_has_error:
+            if log_exists and Log(logs, candidate).identifyError(error):
                 search_filename = candidate
+                break
 
         if search_filename:
             print(f'Scanning "{search_filename}"')
@@ -480,16 +736,24 @@ class ModPack:
         # find the only True value in the list
         # number of iterations = int(ceil(log2(len(graph_list))))
         def binaryGraphElimination(_list: List[DependencyGraph]) -> int:
-            __list = [DependencyGraph(Mod(self))] + _list
+            __list = [DependencyGraph(Mod(self), resolver)] + _list
             left = 0
             right = len(__list) - 1
+            # graphs disabled by the previous probe. only the difference to
+            # the next probe gets toggled, instead of touching every jar again
+            disabled: Set[DependencyGraph] = set()
+            run = self.run
 
             while left <= right:
                 mid = (left + right) // 2
-                # TODO: Disable graphs in __list[mid:]
-                for graph in __list[mid:]:
+                # probe with every graph in __list[mid:] disabled
+                target = set(__list[mid:])
+                for graph in disabled - target:
+                    graph.enable_all()
+                for graph in target - disabled:
                     graph.disable_all()
-                result = self.run()  # return True if run occurs successfully
+                disabled = target
+                result = run()  # return True if run occurs successfully
                 if any(__list[mid:]):
                     left = mid + 1
                 else:
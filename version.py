@@ -1,12 +1,23 @@
 
-from attrs import define
+from attrs import define, field
 
-from typing import cast, List
+from typing import cast, List, Optional, Tuple
 import sys
 import re
 
 
 VERSION_DELIMITERS = ['+', '_', ':']
+# everything a plain `1.20.1-47.2.0` style version is made of, once the
+# delimiters have been normalised to '-'
+NUMERIC_VERSION_CHARS = '0123456789.'
+
+TEXT_ONLY_PART_RE = re.compile(r'(?!\.)[0-9]*[a-z]+[0-9a-z]*$')
+VERSION_PART_RE = re.compile(r'^[a-z0-9.]+$')
+DOTTED_WORD_RE = re.compile(r'[.]*([a-z]+[.]+)')
+DIGIT_LETTER_RE = re.compile(r'[0-9]([a-z])')
+LETTER_RE = re.compile(r'([a-z])')
+SINGLE_VERSION_RE = re.compile(r'^[a-zA-Z0-9-+:_.]+$')
+VERSION_RANGE_RE = re.compile(r'([\[\(][0-9a-zA-Z+-_:., ]*[\]\)])')
 
 
 class BadVersionString(ValueError):
@@ -20,6 +31,11 @@ class ValidationFailure(Exception):
 @define
 class VersionPart:
     components: List[int]
+    # components with trailing zeros dropped, so versions of different
+    # lengths compare correctly as plain tuples
+    _key: Optional[Tuple[int, ...]] = field(
+        default=None, init=False, eq=False, repr=False
+    )
 
     def __str__(self) -> str:
         return '.'.join([str(x) for x in self.components])
@@ -27,61 +43,40 @@ class VersionPart:
     def __repr__(self):
         return self.__str__()
 
+    @property
+    def key(self) -> Tuple[int, ...]:
+        if self._key is None:
+            end = len(self.components)
+            while end > 0 and self.components[end - 1] == 0:
+                end -= 1
+            self._key = tuple(self.components[:end])
+        return self._key
+
     def __eq__(self, other: 'VersionPart') -> bool:  # type: ignore[override]
-        for i in range(max(len(self.components), len(other.components))):
-            a = self.components[i] if len(self.components) > i else 0
-            b = other.components[i] if len(other.components) > i else 0
-            if a < b:
-                return False
-            elif a > b:
-                return False
-        return True
+        return self.key == other.key
 
     def __lt__(self, other: 'VersionPart') -> bool:
-        for i in range(max(len(self.components), len(other.components))):
-            a = self.components[i] if len(self.components) > i else 0
-            b = other.components[i] if len(other.components) > i else 0
-            if a < b:
-                return True
-            elif a > b:
-                return False
-        return False
+        return self.key < other.key
 
     def __le__(self, other: 'VersionPart') -> bool:
-        for i in range(max(len(self.components), len(other.components))):
-            a = self.components[i] if len(self.components) > i else 0
-            b = other.components[i] if len(other.components) > i else 0
-            if a < b:
-                return True
-            elif a > b:
-                return False
-        return True
+        return self.key <= other.key
 
     def __gt__(self, other: 'VersionPart') -> bool:
-        for i in range(max(len(self.components), len(other.components))):
-            a = self.components[i] if len(self.components) > i else 0
-            b = other.components[i] if len(other.components) > i else 0
-            if a > b:
-                return True
-            elif a < b:
-                return False
-        return False
+        return self.key > other.key
 
     def __ge__(self, other: 'VersionPart') -> bool:
-        for i in range(max(len(self.components), len(other.components))):
-            a = self.components[i] if len(self.components) > i else 0
-            b = other.components[i] if len(other.components) > i else 0
-            if a > b:
-                return True
-            elif a < b:
-                return False
-        return True
+        return self.key >= other.key
 
 
 @define
 class Version:
     text: str
     parts: List[VersionPart] = []
+    # part keys with trailing all-zero parts dropped. comparing these
+    # tuples runs in C instead of padding and looping over the parts
+    _key: Optional[Tuple[Tuple[int, ...], ...]] = field(
+        default=None, init=False, eq=False, repr=False
+    )
 
     def __str__(self) -> str:
         if self.text != "*":
@@ -97,6 +92,22 @@ class Version:
         if text_raw in ["", "*"]:
             return cls("*")
 
+        # most versions are only dotted numbers, which need none of the
+        # letter rewriting below and can be split and converted directly
+        text = text_raw
+        for DELIMITER in VERSION_DELIMITERS:
+            text = text.replace(DELIMITER, '-')
+        numeric_parts = [x for x in text.split('-') if x != '']
+        if len(numeric_parts) > 0 and not any(
+                    x.strip(NUMERIC_VERSION_CHARS) for x in numeric_parts
+                ):
+            return cls(
+                text, [
+                    VersionPart([int(x) for x in part.split('.') if x != ''])
+                    for part in numeric_parts
+                ]
+            )
+
         text = text_raw.lower()
         text = text.replace('alpha', '0')
         text = text.replace('beta', '1')
@@ -118,19 +129,19 @@ class Version:
             # disallow candidates that are:
             #   - text-only
             #   - commit refs
-            if re.fullmatch(r'(?!\.)[0-9]*[a-z]+[0-9a-z]*$', candidate):
+            if TEXT_ONLY_PART_RE.fullmatch(candidate):
                 continue
 
-            elif re.fullmatch(r'^[a-z0-9.]+$', candidate):
-                for word in re.findall(r'[.]*([a-z]+[.]+)', candidate):
+            elif VERSION_PART_RE.fullmatch(candidate):
+                for word in DOTTED_WORD_RE.findall(candidate):
                     candidate = candidate.replace(word, '')
 
-                for letter in re.findall(r'[0-9]([a-z])', candidate):
+                for letter in DIGIT_LETTER_RE.findall(candidate):
                     letter = cast(str, letter)
                     idx = ord(letter) - ord('a') + 1
                     candidate = candidate.replace(f'{letter}', f'.{idx}')
 
-                for letter in re.findall(r'([a-z])', candidate):
+                for letter in LETTER_RE.findall(candidate):
                     letter = cast(str, letter)
                     idx = ord(letter) - ord('a') + 1
                     candidate = candidate.replace(f'{letter}', f'{idx}')
@@ -148,55 +159,29 @@ class Version:
 
         raise BadVersionString(f"Invalid version string '{text}'")
 
+    @property
+    def key(self) -> Tuple[Tuple[int, ...], ...]:
+        if self._key is None:
+            keys = [part.key for part in self.parts]
+            while keys and keys[-1] == ():
+                keys.pop()
+            self._key = tuple(keys)
+        return self._key
+
     def __eq__(self, other: 'Version') -> bool:  # type: ignore[override]
-        for i in range(max(len(self.parts), len(other.parts))):
-            a = self.parts[i] if len(self.parts) > i else VersionPart([0])
-            b = other.parts[i] if len(other.parts) > i else VersionPart([0])
-            if a < b:
-                return False
-            elif a > b:
-                return False
-        return True
+        return self.key == other.key
 
     def __lt__(self, other: 'Version') -> bool:
-        for i in range(max(len(self.parts), len(other.parts))):
-            a = self.parts[i] if len(self.parts) > i else VersionPart([0])
-            b = other.parts[i] if len(other.parts) > i else VersionPart([0])
-            if a < b:
-                return True
-            elif a > b:
-                return False
-        return False
+        return self.key < other.key
 
     def __le__(self, other: 'Version') -> bool:
-        for i in range(max(len(self.parts), len(other.parts))):
-            a = self.parts[i] if len(self.parts) > i else VersionPart([0])
-            b = other.parts[i] if len(other.parts) > i else VersionPart([0])
-            if a < b:
-                return True
-            elif a > b:
-                return False
-        return True
+        return self.key <= other.key
 
     def __gt__(self, other: 'Version') -> bool:
-        for i in range(max(len(self.parts), len(other.parts))):
-            a = self.parts[i] if len(self.parts) > i else VersionPart([0])
-            b = other.parts[i] if len(other.parts) > i else VersionPart([0])
-            if a > b:
-                return True
-            elif a < b:
-                return False
-        return False
+        return self.key > other.key
 
     def __ge__(self, other: 'Version') -> bool:
-        for i in range(max(len(self.parts), len(other.parts))):
-            a = self.parts[i] if len(self.parts) > i else VersionPart([0])
-            b = other.parts[i] if len(other.parts) > i else VersionPart([0])
-            if a > b:
-                return True
-            elif a < b:
-                return False
-        return True
+        return self.key >= other.key
 
 
 @define
@@ -252,15 +237,12 @@ class VersionRange:
         if range_raw in ["*", ","]:
             any_range_part = VersionRangePart(Version.fromString("*"), True)
             return [cls(any_range_part, any_range_part)]
-        elif re.fullmatch(r'^[a-zA-Z0-9-+:_.]+$', range_raw):
+        elif SINGLE_VERSION_RE.fullmatch(range_raw):
             vrp = VersionRangePart(Version.fromString(range_raw), True)
             return [cls(vrp, vrp)]
 
         found = False
-        for range in re.findall(
-                    r'([\[\(][0-9a-zA-Z+-_:., ]*[\]\)])',
-                    range_raw
-                ):
+        for range in VERSION_RANGE_RE.findall(range_raw):
             found = True
             parts = range.split(',')
             lower = parts[0].strip()